@@ -1,34 +1,42 @@
-import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
 
-from dotenv import load_dotenv
-from pydantic import BaseModel
+from pydantic import Field, field_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
-# Load .env if present
-load_dotenv()
+
+def _default_registry_path() -> str:
+    here = Path(__file__).resolve().parent
+    return str(here / "registry.yaml")
 
 
-class Settings(BaseModel):
-    database_url: str
-    registry_path: str
+class Settings(BaseSettings):
+    # Values come from the environment (or .env if present), e.g. DATABASE_URL
+    model_config = SettingsConfigDict(env_file=".env", frozen=True, extra="ignore")
+
+    database_url: str = "sqlite+aiosqlite:///./gateway.db"
+    registry_path: str = Field(default_factory=_default_registry_path)
     backend_timeout: float = 10.0
     retry_attempts: int = 2
     retry_backoff_base: float = 0.5
+    retry_max_delay: float = 30.0
+    retry_jitter: bool = True
+    db_pool_size: int = 20
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
 
-    class Config:
-        arbitrary_types_allowed = True
+    @field_validator("database_url")
+    @classmethod
+    def _use_async_sqlite_driver(cls, v: str) -> str:
+        # The engine is async-only; upgrade pre-async .env values like sqlite:///./gateway.db
+        if v.startswith("sqlite://"):
+            return "sqlite+aiosqlite://" + v[len("sqlite://"):]
+        return v
 
 
-def _default_registry_path() -> str:
-    here = Path(__file__).resolve().parent
-    return str(here / "registry.yaml")
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    return Settings()
 
 
-settings = Settings(
-    database_url=os.getenv("DATABASE_URL", "sqlite:///./gateway.db"),
-    registry_path=os.getenv("REGISTRY_PATH", _default_registry_path()),
-    backend_timeout=float(os.getenv("BACKEND_TIMEOUT", "10")),
-    retry_attempts=int(os.getenv("RETRY_ATTEMPTS", "2")),
-    retry_backoff_base=float(os.getenv("RETRY_BACKOFF_BASE", "0.5")),
-)
\ No newline at end of file
+settings = get_settings()
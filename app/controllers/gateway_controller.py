@@ -1,12 +1,24 @@
+import logging
 from typing import Any, Dict
 from uuid import UUID
 
-from fastapi import APIRouter, Body, HTTPException
+import orjson
+from fastapi import APIRouter, HTTPException, Request, Response
 
 from app.schemas.api import CreateSessionRequest, CreateSessionResponse, SessionInfoResponse
 from app.services.session_manager import SessionManager
 from app.services.protocol_handler import ProtocolHandler
 
+logger = logging.getLogger(__name__)
+
+# Pre-serialized JSON-RPC replies for bodies that never reach the handler
+_PARSE_ERROR = orjson.dumps(
+    {"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": "Parse error"}}
+)
+_INVALID_REQUEST = orjson.dumps(
+    {"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "Invalid Request"}}
+)
+
 
 def get_router(session_manager: SessionManager, protocol_handler: ProtocolHandler) -> APIRouter:
     router = APIRouter()
@@ -25,22 +37,31 @@ def get_router(session_manager: SessionManager, protocol_handler: ProtocolHandle
         )
 
     @router.post("/session/{session_id}/mcp")
-    async def mcp_endpoint(
-        session_id: UUID,
-        body: Dict[str, Any] = Body(...),
-    ) -> Dict[str, Any]:
+    async def mcp_endpoint(session_id: UUID, request: Request) -> Response:
         """
         Generic MCP HTTP endpoint (JSON-RPC style messages).
+
+        The raw body is parsed once with orjson instead of going through
+        FastAPI's dict validation; the JSON-RPC handler validates it.
         """
-        print("RAW MCP HTTP body:", body)
-        
+        raw = await request.body()
+        try:
+            body = orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            return Response(content=_PARSE_ERROR, media_type="application/json")
+        if not isinstance(body, dict):
+            return Response(content=_INVALID_REQUEST, media_type="application/json")
+
+        logger.debug("RAW MCP HTTP body: %s", body)
+
         # Process as plain JSON-RPC
         resp = await protocol_handler.handle_request(session_id, body)
-        
-        print("Response to client:", resp)
-        
-        # Return plain JSON-RPC (no envelope)
-        return resp
+
+        logger.debug("Response to client: %s", resp)
+
+        # Return plain JSON-RPC (no envelope), already serialized by the handler
+        return Response(content=resp, media_type="application/json")
+
     @router.get("/health")
     async def health() -> Dict[str, Any]:
         """
@@ -56,27 +77,17 @@ def get_router(session_manager: SessionManager, protocol_handler: ProtocolHandle
 
     @router.get("/sessions/{session_id}", response_model=SessionInfoResponse)
     async def get_session_info(session_id: UUID) -> SessionInfoResponse:
-        db_sess = session_manager.get_session_info(session_id)
+        db_sess = await session_manager.get_session_info(session_id)
         if not db_sess:
             raise HTTPException(status_code=404, detail="Session not found")
 
-        servers = [s.get("name") for s in __safe_json_load(db_sess.servers_json)]
-
         return SessionInfoResponse(
             id=db_sess.id,
             state=db_sess.state,
-            servers=servers,
+            servers=[s.get("name") for s in db_sess.servers_json or ()],
             created_at=db_sess.created_at,
             updated_at=db_sess.updated_at,
         )
 
     return router
 
-
-def __safe_json_load(data: str):
-    import json
-
-    try:
-        return json.loads(data)
-    except Exception:
-        return []
\ No newline at end of file
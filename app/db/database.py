@@ -1,21 +1,90 @@
-from contextlib import contextmanager
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from uuid import UUID
 
-from sqlmodel import SQLModel, create_engine, Session
+import orjson
+from sqlalchemy import event, make_url, text
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.config import settings
 
-engine = create_engine(settings.database_url, echo=False, future=True)
+_connect_args = {"check_same_thread": False} if settings.database_url.startswith("sqlite") else {}
 
 
-def init_db() -> None:
-    SQLModel.metadata.create_all(engine)
+def _pool_args(url: str) -> dict:
+    """
+    QueuePool sizing from settings; empty when the dialect picks another pool
+    (e.g. StaticPool for in-memory SQLite), which rejects these arguments.
+    """
+    parsed = make_url(url)
+    if not issubclass(parsed.get_dialect().get_pool_class(parsed), QueuePool):
+        return {}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+    }
+
+
+engine = create_async_engine(
+    settings.database_url,
+    **_pool_args(settings.database_url),
+    pool_pre_ping=True,
+    connect_args=_connect_args,
+    json_serializer=lambda obj: orjson.dumps(obj).decode(),
+    json_deserializer=orjson.loads,
+    echo=False,
+    future=True,
+)
+
+if engine.url.get_backend_name() == "sqlite":
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+        """
+        WAL lets readers proceed while a session insert/update is in flight.
+        """
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA cache_size=-64000")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+async_session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def _upgrade_legacy_schema(conn) -> None:
+    """
+    Bring a sessions table created by older releases up to the current schema;
+    create_all never alters existing tables.
+    """
+    if conn.dialect.name == "sqlite":
+        # Ids used to be stored as hex text; rewrite them as the 16-byte form GUID binds
+        legacy_ids = conn.execute(text("SELECT id FROM sessions WHERE typeof(id) = 'text'")).scalars().all()
+        for legacy_id in legacy_ids:
+            conn.execute(
+                text("UPDATE sessions SET id = :new WHERE id = :old"),
+                {"new": UUID(legacy_id).bytes, "old": legacy_id},
+            )
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_sessions_updated_at ON sessions (updated_at)"))
+
+
+async def init_db() -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.run_sync(_upgrade_legacy_schema)
 
 
-@contextmanager
-def get_db_session() -> Session:
+@asynccontextmanager
+async def get_db_session() -> AsyncIterator[AsyncSession]:
     """
-    Simple context manager to get a SQLModel Session.
+    Simple async context manager to get a SQLModel AsyncSession.
     Use in non-request code (services).
     """
-    with Session(engine) as session:
-        yield session
\ No newline at end of file
+    async with async_session_factory() as session:
+        yield session
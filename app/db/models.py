@@ -1,10 +1,60 @@
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
 from uuid import UUID, uuid4
 
+from sqlalchemy import BINARY, JSON, Column
+from sqlalchemy.dialects.postgresql import JSONB, UUID as PG_UUID
+from sqlalchemy.types import TypeDecorator
 from sqlmodel import SQLModel, Field
 
 
+# JSON column: JSONB on PostgreSQL, text-backed JSON elsewhere. (De)serialization
+# lives in the engine (orjson, see database.py) rather than in the services;
+# only PostgreSQL JSONB has the driver decode values instead.
+_JSON = JSON().with_variant(JSONB(), "postgresql")
+
+
+def utcnow() -> datetime:
+    """
+    Current time as an aware UTC datetime (SQLModel's datetime columns reject naive values).
+    """
+    return datetime.now(timezone.utc)
+
+
+class GUID(TypeDecorator):
+    """
+    Platform-independent UUID column.
+
+    Uses the native UUID type on PostgreSQL and 16 raw bytes elsewhere
+    (instead of a 36-char string), which keeps the PK index compact.
+    """
+
+    impl = BINARY(16)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(PG_UUID(as_uuid=True))
+        return dialect.type_descriptor(BINARY(16))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if not isinstance(value, UUID):
+            value = UUID(str(value))
+        if dialect.name == "postgresql":
+            return value
+        return value.bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, UUID):
+            return value
+        if isinstance(value, str):
+            # Legacy rows store the id as 32/36-char hex text
+            return UUID(value)
+        return UUID(bytes=bytes(value))
+
+
 class MCPGatewaySession(SQLModel, table=True):
     """
     Persistent session record.
@@ -14,14 +64,18 @@ class MCPGatewaySession(SQLModel, table=True):
 
     __tablename__ = "sessions"
 
-    id: UUID = Field(default_factory=uuid4, primary_key=True, index=True)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    id: UUID = Field(default_factory=uuid4, sa_column=Column(GUID(), primary_key=True))
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow, index=True)
     state: str = Field(default="ready", index=True)  # initial, initializing, ready, failed
 
-    # JSON strings
-    servers_json: str = Field(description="JSON string of selected servers")
-    credentials_json: str = Field(description="JSON string of credentials")
+    # JSON documents
+    servers_json: List[Dict[str, Any]] = Field(
+        sa_column=Column(_JSON, nullable=False), description="Selected servers"
+    )
+    credentials_json: Dict[str, Any] = Field(
+        sa_column=Column(_JSON, nullable=False), description="Per-provider credentials"
+    )
 
     # Reserved for future use (e.g., persisted tool map or metadata)
-    #metadata_json: Optional[str] = None
\ No newline at end of file
+    #metadata_json: Optional[str] = None
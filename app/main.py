@@ -33,7 +33,7 @@ def create_app() -> FastAPI:
     async def lifespan(app: FastAPI):
         # --- startup ---
         logger.info("Initializing database...")
-        init_db()
+        await init_db()
         logger.info("Loading persisted sessions (best-effort)...")
         await session_manager.load_persisted_sessions()
         logger.info("Startup complete.")
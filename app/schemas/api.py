@@ -2,10 +2,15 @@ from datetime import datetime
 from typing import Any, Dict, List
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+
+_MODEL_CONFIG = ConfigDict(extra="forbid", frozen=True, str_strip_whitespace=False, validate_default=False)
 
 
 class CreateSessionRequest(BaseModel):
+    model_config = _MODEL_CONFIG
+
     servers: List[str] = Field(..., description="List of provider names to include in this session")
     credentials: Dict[str, Dict[str, Any]] = Field(
         ..., description="Per-provider credentials; shape depends on auth_type"
@@ -13,12 +18,16 @@ class CreateSessionRequest(BaseModel):
 
 
 class CreateSessionResponse(BaseModel):
+    model_config = _MODEL_CONFIG
+
     session_id: UUID
     mcp_endpoint: str
     status: str = "created"
 
 
 class SessionInfoResponse(BaseModel):
+    model_config = _MODEL_CONFIG
+
     id: UUID
     state: str
     servers: List[str]
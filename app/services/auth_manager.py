@@ -1,4 +1,8 @@
-from typing import Dict, Any
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Any, Tuple
+
+import orjson
 
 from .registry_loader import ProviderConfig
 
@@ -6,8 +10,17 @@ from .registry_loader import ProviderConfig
 class AuthManager:
     """
     Builds auth headers for backend MCP servers.
+
+    Results are memoized per (provider, auth_type, credential hash) in a
+    size-capped LRU, since the same credentials always yield the same headers.
     """
 
+    __slots__ = ("_max_cache_entries", "_cache")
+
+    def __init__(self, max_cache_entries: int = 1024) -> None:
+        self._max_cache_entries = max_cache_entries
+        self._cache: "OrderedDict[Tuple[str, str, bytes], Dict[str, str]]" = OrderedDict()
+
     def build_headers(self, provider: ProviderConfig, credentials: Dict[str, Any]) -> Dict[str, str]:
         """
         Given provider config and user credentials,
@@ -18,8 +31,26 @@ class AuthManager:
         - api_key: expects credentials["api_key"] or ["key"] or ["token"]
         - none / missing: no auth headers
         """
-        headers: Dict[str, str] = dict(provider.extra_headers or {})
         auth_type = (provider.auth_type or "none").lower()
+        key_material = hashlib.blake2b(
+            orjson.dumps(credentials, option=orjson.OPT_SORT_KEYS), digest_size=16
+        ).digest()
+        cache_key = (provider.name, auth_type, key_material)
+
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            self._cache.move_to_end(cache_key)
+            return dict(cached)
+
+        headers = self._build_headers(provider, auth_type, credentials)
+        self._cache[cache_key] = headers
+        if len(self._cache) > self._max_cache_entries:
+            self._cache.popitem(last=False)
+        return dict(headers)
+
+    @staticmethod
+    def _build_headers(provider: ProviderConfig, auth_type: str, credentials: Dict[str, Any]) -> Dict[str, str]:
+        headers: Dict[str, str] = dict(provider.extra_headers or {})
         # No-auth providers
         if auth_type in ("none", ""):
             return headers
@@ -28,7 +59,6 @@ class AuthManager:
             token = credentials.get("token")
             if not token:
                 raise ValueError(f"Missing 'token' for bearer auth (provider={provider.name})")
-            print(f'token is {token}')
             headers["Authorization"] = f"Bearer {token}"
         elif auth_type == "api_key":
             key = (
@@ -1,12 +1,15 @@
 from __future__ import annotations
 import asyncio
-from typing import Dict
+import random
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
 from uuid import UUID
 
 import httpx
 
 from app.config import settings
-from app.utils.retries import async_retry
+from app.utils.retries import backoff_schedule
 
 # Avoid circular import at runtime
 from typing import TYPE_CHECKING
@@ -16,50 +19,91 @@ if TYPE_CHECKING:
 
 class BackendHandle:
     """
-    Lightweight wrapper around httpx.AsyncClient providing
-    a `.post(json=...)` coroutine with retry + timeout.
+    Lightweight per-(session, provider) view over the shared httpx.AsyncClient
+    providing a `.post(body)` coroutine with retry + timeout.
+
+    Bodies are pre-serialized JSON bytes so a payload fanned out to several
+    providers is only encoded once.
     """
 
-    def __init__(self, base_url: str, headers: Dict[str, str]) -> None:
+    __slots__ = ("base_url", "_client", "_closed", "_headers")
+
+    def __init__(self, client: httpx.AsyncClient, base_url: str, headers: Dict[str, str]) -> None:
         self.base_url = base_url
-        self._client = httpx.AsyncClient(base_url=base_url, headers=headers)
+        self._client = client
+        self._headers: Dict[str, str] = {"content-type": "application/json", **headers}
         self._closed = False
 
-    async def post(self, json: dict, timeout: float | None = None) -> httpx.Response:
+    async def post(self, body: bytes, timeout: float | None = None) -> httpx.Response:
+        return await self._send(body, timeout, stream=False)
+
+    @asynccontextmanager
+    async def stream(self, body: bytes, timeout: float | None = None) -> AsyncIterator[httpx.Response]:
+        """
+        Like `post`, but yields the response before its body is read so the
+        caller can consume it incrementally. The response is closed on exit.
+        """
+        resp = await self._send(body, timeout, stream=True)
+        try:
+            yield resp
+        finally:
+            await resp.aclose()
+
+    async def _send(self, body: bytes, timeout: float | None, *, stream: bool) -> httpx.Response:
         if self._closed:
             raise RuntimeError("BackendHandle is closed")
 
-        async def do_request() -> httpx.Response:
-            return await self._client.post("", json=json, timeout=timeout or settings.backend_timeout)
-
-        resp = await async_retry(
-            do_request,
-            retries=settings.retry_attempts,
-            base_delay=settings.retry_backoff_base,
-            exceptions=(httpx.RequestError,),
+        request = self._client.build_request(
+            "POST",
+            self.base_url,
+            content=body,
+            headers=self._headers,
+            timeout=timeout or settings.backend_timeout,
         )
-        return resp
+        # Retry transient transport errors with capped, jittered exponential backoff
+        base_delay = settings.retry_backoff_base
+        delays = backoff_schedule(settings.retry_attempts, base_delay, settings.retry_max_delay)
+        for delay in delays:
+            try:
+                return await self._client.send(request, stream=stream)
+            except httpx.RequestError:
+                await asyncio.sleep(random.uniform(base_delay, delay) if settings.retry_jitter else delay)
+        # Final attempt: let any exception propagate
+        return await self._client.send(request, stream=stream)
+
     def update_headers(self, headers: Dict[str, str]) -> None:
         """
-        Update default headers for all future requests from this client.
+        Update default headers for all future requests from this handle.
         """
-        self._client.headers.update(headers)
+        self._headers.update(headers)
 
     async def aclose(self) -> None:
-        if not self._closed:
-            self._closed = True
-            await self._client.aclose()
+        # The underlying client is shared and owned by ConnectionManager
+        self._closed = True
 
 
 class ConnectionManager:
     """
-    Factory/manager for httpx.AsyncClient instances scoped by (session_id, provider).
+    Factory/manager for BackendHandle instances scoped by (session_id, provider).
+    All handles share a single pooled httpx.AsyncClient.
     """
 
+    __slots__ = ("_client", "_handles", "_session_locks")
+
     def __init__(self) -> None:
+        self._client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=500,
+                max_keepalive_connections=100,
+                keepalive_expiry=30.0,
+            ),
+            timeout=settings.backend_timeout,
+        )
         # Map: session_id -> provider -> BackendHandle
         self._handles: Dict[UUID, Dict[str, BackendHandle]] = {}
-        self._lock = asyncio.Lock()
+        # Per-session creation locks so sessions don't serialize on each other
+        self._session_locks: Dict[UUID, asyncio.Lock] = defaultdict(asyncio.Lock)
 
     async def get_or_create_handle(
         self,
@@ -69,7 +113,12 @@ class ConnectionManager:
         headers: Dict[str, str],
         runtime: "RuntimeSessionState | None" = None,
     ) -> BackendHandle:
-        async with self._lock:
+        # Fast path: handle already exists, no lock needed
+        per_session = self._handles.get(session_id)
+        if per_session and provider_name in per_session:
+            return per_session[provider_name]
+
+        async with self._session_locks[session_id]:
             per_session = self._handles.setdefault(session_id, {})
             if provider_name in per_session:
                 return per_session[provider_name]
@@ -77,7 +126,7 @@ class ConnectionManager:
             if runtime is not None:
                 provider_headers = runtime.provider_session_headers.get(provider_name, {})
                 merged_headers.update(provider_headers)
-            handle = BackendHandle(base_url=rpc_endpoint, headers=headers)
+            handle = BackendHandle(self._client, base_url=rpc_endpoint, headers=merged_headers)
             per_session[provider_name] = handle
             return handle
 
@@ -85,8 +134,9 @@ class ConnectionManager:
         return self._handles.get(session_id, {}).get(provider_name)
 
     async def aclose_all(self) -> None:
-        async with self._lock:
-            for per_session in self._handles.values():
-                for handle in per_session.values():
-                    await handle.aclose()
-            self._handles.clear()
\ No newline at end of file
+        for per_session in self._handles.values():
+            for handle in per_session.values():
+                await handle.aclose()
+        self._handles.clear()
+        self._session_locks.clear()
+        await self._client.aclose()
\ No newline at end of file
@@ -1,18 +1,36 @@
 import asyncio
 import logging
-from typing import Any, Dict, List
+import string
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List
 from uuid import UUID
-import re
 import time
-import json
 
 import httpx
+import orjson
 
-from .session_manager import SessionManager
+from .session_manager import SessionManager, ToolInfo
 
 logger = logging.getLogger(__name__)
 
-def parse_sse_json_body(body: str):
+
+class _SafeToolNameTable(dict):
+    """
+    str.translate table: allowed chars [a-zA-Z0-9_-] map to themselves,
+    anything else (including non-ASCII) maps to "_".
+    """
+
+    def __missing__(self, key: int) -> str:
+        return "_"
+
+
+_SAFE_TBL = _SafeToolNameTable({ord(c): ord(c) for c in string.ascii_letters + string.digits + "_-"})
+
+
+_SSE_MESSAGE_PREFIX = b"event: message\ndata:"
+
+
+def parse_sse_json_body(body: bytes):
     """
     Parse a single-event SSE body of the form:
 
@@ -21,18 +39,109 @@ def parse_sse_json_body(body: str):
 
     and return the JSON object.
     """
-    data_line = None
-    for line in body.splitlines():
-        line = line.strip()
-        if line.startswith("data:"):
-            # Everything after 'data:' is JSON
-            data_line = line[len("data:"):].strip()
-            break
+    if body.startswith(_SSE_MESSAGE_PREFIX):
+        # Fast path: the frame shape every known MCP backend emits
+        start = len(_SSE_MESSAGE_PREFIX)
+    elif body.startswith(b"data:"):
+        start = len(b"data:")
+    else:
+        i = body.find(b"\ndata:")
+        if i == -1:
+            raise ValueError(f"No 'data:' line found in SSE body: {body!r}")
+        start = i + len(b"\ndata:")
+
+    # Everything after 'data:' up to the end of the line is JSON; orjson
+    # skips the surrounding whitespace and parses the memoryview without a copy.
+    end = body.find(b"\n", start)
+    if end == -1:
+        end = len(body)
+    return orjson.loads(memoryview(body)[start:end])
+
+
+# How long to keep reading an SSE body without Content-Length after its first
+# frame, hoping the backend ends the stream so the connection can be pooled
+_SSE_DRAIN_GRACE_SECONDS = 0.05
+
+
+async def _drain_sse_tail(resp: httpx.Response, chunks: AsyncIterator[bytes]) -> None:
+    """
+    Consume what follows the first frame so httpx can return the connection to
+    the pool instead of closing it. A Content-Length body is bounded and read
+    to the end; otherwise the stream gets a short grace period to finish, and a
+    truly open-ended stream is cut off (the caller closes the response).
+    """
+
+    async def consume() -> None:
+        async for _ in chunks:
+            pass
+
+    if "content-length" in resp.headers:
+        await consume()
+        return
+    try:
+        await asyncio.wait_for(consume(), _SSE_DRAIN_GRACE_SECONDS)
+    except asyncio.TimeoutError:
+        pass
 
-    if data_line is None:
-        raise ValueError(f"No 'data:' line found in SSE body: {body!r}")
 
-    return json.loads(data_line)
+async def read_first_sse_event(resp: httpx.Response) -> bytes:
+    """
+    Read a streamed SSE response until its first `data:` line is complete.
+
+    Each chunk is scanned once (resuming from the previous offset), so large
+    frames are not re-searched. Whatever follows is drained (see
+    _drain_sse_tail) rather than parsed.
+    Returns the bytes received up to and including that line.
+    """
+    buf = bytearray()
+    data_start = -1
+    scanned = 0
+    chunks = resp.aiter_bytes()
+    async for chunk in chunks:
+        buf += chunk
+        if data_start == -1:
+            if buf.startswith(b"data:"):
+                data_start = 0
+            else:
+                # Step back so a "\ndata:" split across chunks is still found
+                i = buf.find(b"\ndata:", max(scanned - len(b"\ndata:") + 1, 0))
+                if i == -1:
+                    scanned = len(buf)
+                    continue
+                data_start = i + 1
+            scanned = data_start + len(b"data:")
+        end = buf.find(b"\n", scanned)
+        if end != -1:
+            await _drain_sse_tail(resp, chunks)
+            return bytes(buf[:end + 1])
+        scanned = len(buf)
+    return bytes(buf)
+
+
+_SSE_CONTENT_TYPE = "text/event-stream"
+
+
+def is_sse_response(resp: httpx.Response, streams_sse: bool | None = None) -> bool:
+    """
+    Whether a backend response is SSE-framed. Providers that declare
+    `streams_sse` in the registry skip the header inspection entirely.
+    """
+    if streams_sse is not None:
+        return streams_sse
+    content_type = resp.headers.get("content-type") or ""
+    return content_type[:len(_SSE_CONTENT_TYPE)] == _SSE_CONTENT_TYPE
+
+
+def parse_jsonrpc_body(raw: bytes, is_sse: bool) -> Dict[str, Any]:
+    """
+    Parse a backend JSON-RPC response (plain JSON or single-event SSE)
+    straight from the response bytes into a dict.
+    """
+    data = parse_sse_json_body(raw) if is_sse else orjson.loads(raw)
+    if not isinstance(data, dict):
+        raise ValueError(f"Expected a JSON-RPC object, got {type(data).__name__}")
+    return data
+
 
 class MCPMultiplexer:
     """
@@ -44,10 +153,11 @@ class MCPMultiplexer:
         self.session_manager = session_manager
     
     @staticmethod
+    @lru_cache(maxsize=4096)
     def _make_prefixed_tool_name(provider: str, name: str) -> str:
         # Ensure both parts only contain allowed chars: [a-zA-Z0-9_-]
-        safe_provider = re.sub(r"[^a-zA-Z0-9_-]", "_", provider)
-        safe_name = re.sub(r"[^a-zA-Z0-9_-]", "_", name)
+        safe_provider = provider.translate(_SAFE_TBL)
+        safe_name = name.translate(_SAFE_TBL)
         return f"{safe_provider}__{safe_name}"
 
     async def initialize(self, session_id: UUID, initialize_request: Dict[str, Any]) -> Dict[str, Any]:
@@ -57,22 +167,20 @@ class MCPMultiplexer:
         """
         runtime = await self.session_manager.get_runtime_state(session_id)
         connections = runtime.connections
+        request_bytes = orjson.dumps(initialize_request)
         async def call_provider(provider: str):
             handle = connections[provider]
             resp: httpx.Response | None = None
             try:
-                logger.info(f'Init body :- {initialize_request}')
-                resp = await handle.post(json=initialize_request,timeout=60)
-                print(f'Response for {provider}: status={resp.status_code}')
-                print(f'Headers for {provider}: {resp.headers}')
-                body = resp.text
-                print(f'Body repr for {provider}: {repr(body)}')
-                if resp.headers.get("content-type", "").startswith("text/event-stream"):
-                    data = parse_sse_json_body(body)
-                else:
-                    data = resp.json()
-
-                print(f'Parsed JSON for {provider}: {data}')
+                logger.debug("Init body for %s: %s", provider, initialize_request)
+                resp = await handle.post(request_bytes, timeout=60)
+                logger.debug("Response for %s: status=%s", provider, resp.status_code)
+                raw = resp.content
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Headers for %s: %s", provider, resp.headers)
+                    logger.debug("Body repr for %s: %r", provider, raw)
+                streams_sse = self.session_manager.registry_loader.get_provider_config(provider).streams_sse
+                data = parse_jsonrpc_body(raw, is_sse_response(resp, streams_sse))
 
                 resp.raise_for_status()
                 return provider, data, None, resp
@@ -80,12 +188,12 @@ class MCPMultiplexer:
                 logger.warning("Initialize failed for provider %s: %s", provider, e)
                 # still return 4 values even on error
                 return provider, None, e, resp
-        print(f'ConnectionKey are : {connections.keys()}')
-        tasks = [call_provider(p) for p in connections.keys()]
-        results = await asyncio.gather(*tasks)
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(call_provider(p)) for p in connections]
+        results = [t.result() for t in tasks]
 
         combined_tools: List[Dict[str, Any]] = []
-        tool_map: Dict[str, Dict[str, str]] = {}
+        tool_map: Dict[str, ToolInfo] = {}
         server_info: List[Dict[str, Any]] = []
         base_result: Dict[str, Any] = {}
 
@@ -102,7 +210,7 @@ class MCPMultiplexer:
 
             # --- persist_response_headers handling ---
             provider_cfg = self.session_manager.registry_loader.get_provider_config(provider)
-            wanted = {h.lower() for h in getattr(provider_cfg, "persist_response_headers", [])}
+            wanted = provider_cfg.persist_response_headers_lower
 
             if resp is not None and wanted:
                 session_headers = {
@@ -144,10 +252,7 @@ class MCPMultiplexer:
                 new_tool["name"] = prefixed_name
                 combined_tools.append(new_tool)
 
-                tool_map[prefixed_name] = {
-                    "provider": provider,
-                    "backend_tool_name": name,
-                }
+                tool_map[prefixed_name] = ToolInfo(provider=provider, backend_tool_name=name)
                 tool_count += 1
 
             server_info.append(
@@ -183,7 +288,11 @@ class MCPMultiplexer:
         """
         runtime = await self.session_manager.get_runtime_state(session_id)
         connections = runtime.connections
-        current_providers=frozenset(connections.keys())
+        current_providers = runtime.providers_mask
+        if current_providers is None:
+            current_providers = runtime.providers_mask = (
+                self.session_manager.registry_loader.provider_mask(connections)
+            )
         CACHE_TTL_SECONDS = 600  # 10 minutes; adjust as needed
         now = time.time()
         if (
@@ -195,40 +304,43 @@ class MCPMultiplexer:
             logger.info(
             "Returning cached tools for session %s (providers=%s)",
             session_id,
-            list(current_providers),
+            list(connections),
         )
 
             cached = runtime.cached_tools
             result = cached["result"]
             tool_map = cached.get("tool_map") or {}
 
-            # This should be very cheap: just set the map for this session
-            self.session_manager.update_tool_map(session_id, tool_map)
+            # Only re-apply the cached map if something (e.g. initialize) replaced it
+            if runtime.tool_name_map is not tool_map:
+                self.session_manager.update_tool_map(session_id, tool_map)
 
             return result
 
+        request_bytes = orjson.dumps(request_body)
+
         async def call_provider(provider: str):
             handle = connections[provider]
             try:
-                resp = await handle.post(json=request_body,timeout=60)
-                print(f'Response for {provider}: status={resp.status_code}')
-                print(f'Headers for {provider}: {resp.headers}')
-                body = resp.text
-                print(f'Body repr for {provider}: {repr(body)}')
-                if resp.headers.get("content-type", "").startswith("text/event-stream"):
-                    data = parse_sse_json_body(body)
-                else:
-                    data = resp.json()
+                resp = await handle.post(request_bytes, timeout=60)
+                logger.debug("Response for %s: status=%s", provider, resp.status_code)
+                raw = resp.content
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Headers for %s: %s", provider, resp.headers)
+                    logger.debug("Body repr for %s: %r", provider, raw)
+                streams_sse = self.session_manager.registry_loader.get_provider_config(provider).streams_sse
+                data = parse_jsonrpc_body(raw, is_sse_response(resp, streams_sse))
                 return provider, data, None
             except (httpx.HTTPError, ValueError) as e:
                 logger.warning("tools/list failed for provider %s: %s", provider, e)
                 return provider, None, e
 
-        tasks = [call_provider(p) for p in connections.keys()]
-        results = await asyncio.gather(*tasks)
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(call_provider(p)) for p in connections]
+        results = [t.result() for t in tasks]
 
         combined_tools: List[Dict[str, Any]] = []
-        tool_map: Dict[str, Dict[str, str]] = {}
+        tool_map: Dict[str, ToolInfo] = {}
         server_info: List[Dict[str, Any]] = []
 
         for provider, payload, error in results:
@@ -254,10 +366,7 @@ class MCPMultiplexer:
                 new_tool["name"] = prefixed_name
                 combined_tools.append(new_tool)
 
-                tool_map[prefixed_name] = {
-                    "provider": provider,
-                    "backend_tool_name": name,
-                }
+                tool_map[prefixed_name] = ToolInfo(provider=provider, backend_tool_name=name)
                 tool_count += 1
 
             server_info.append(
@@ -284,7 +393,7 @@ class MCPMultiplexer:
         logger.info(
             "Cached tools for session %s (providers=%s)",
             session_id,
-            list(current_providers),
+            list(connections),
         )
         # ----------------------
 
@@ -1,38 +1,20 @@
 import logging
-from typing import Any, Dict
+from typing import Any, Awaitable, Callable, ClassVar, Dict
 from uuid import UUID
 
 import httpx
-import json
+import orjson
 
 from app.config import settings
 from app.utils.id_map import IdMapper
 from .session_manager import SessionManager
-from .multiplexer import MCPMultiplexer
+from .multiplexer import MCPMultiplexer, is_sse_response, parse_sse_json_body, read_first_sse_event
 
 logger = logging.getLogger(__name__)
 
-def parse_sse_json_body(body: str):
-    """
-    Parse a single-event SSE body of the form:
-
-        event: message
-        data: {...json...}
-
-    and return the JSON object.
-    """
-    data_line = None
-    for line in body.splitlines():
-        line = line.strip()
-        if line.startswith("data:"):
-            # Everything after 'data:' is JSON
-            data_line = line[len("data:"):].strip()
-            break
-
-    if data_line is None:
-        raise ValueError(f"No 'data:' line found in SSE body: {body!r}")
-
-    return json.loads(data_line)
+_INITIALIZE = "initialize"
+_TOOLS_LIST = "tools/list"
+_TOOLS_CALL = "tools/call"
 
 
 class ProtocolHandler:
@@ -40,6 +22,8 @@ class ProtocolHandler:
     Parses MCP JSON-RPC messages and routes them appropriately.
     """
 
+    __slots__ = ("session_manager", "multiplexer", "id_mapper")
+
     def __init__(
         self,
         session_manager: SessionManager,
@@ -50,13 +34,19 @@ class ProtocolHandler:
         self.multiplexer = multiplexer
         self.id_mapper = id_mapper
 
-    async def handle_request(self, session_id: UUID, body: Dict[str, Any]) -> Dict[str, Any]:
+    async def handle_request(self, session_id: UUID, body: Dict[str, Any]) -> bytes:
         """
         Handle a generic MCP JSON-RPC-like request.
         Required fields: jsonrpc, method, id
+
+        Returns the JSON-RPC response already serialized, so the route can
+        send it as-is without another encoding pass.
         """
+        return orjson.dumps(await self._dispatch(session_id, body))
+
+    async def _dispatch(self, session_id: UUID, body: Dict[str, Any]) -> Dict[str, Any]:
         try:
-            self.session_manager.ensure_session_exists(session_id)
+            await self.session_manager.ensure_session_exists(session_id)
         except KeyError:
             return self._jsonrpc_error(
                 body,
@@ -68,23 +58,20 @@ class ProtocolHandler:
         if not method:
             return self._jsonrpc_error(body, code=-32600, message="Missing 'method' in request")
 
-        if method == "initialize":
-            return await self._handle_initialize(session_id, body)
-        elif method == "tools/list":
-            return await self._handle_tools_list(session_id, body)
-        elif method == "tools/call":
-            return await self._handle_tools_call(session_id, body)
-        else:
+        # Client-supplied method names are not interned: unbounded input would never be freed
+        handler = self._METHODS.get(method) if isinstance(method, str) else None
+        if handler is None:
             return self._jsonrpc_error(
                 body, code=-32601, message=f"Method '{method}' is not supported by gateway"
             )
+        return await handler(self, session_id, body)
 
     async def _handle_initialize(self, session_id: UUID, body: Dict[str, Any]) -> Dict[str, Any]:
+        get = body.get
         combined_result = await self.multiplexer.initialize(session_id, body)
-        print(f'combined result :- {combined_result}')
         return {
-            "jsonrpc": body.get("jsonrpc", "2.0"),
-            "id": body.get("id"),
+            "jsonrpc": get("jsonrpc", "2.0"),
+            "id": get("id"),
             "result": combined_result,
         }
     
@@ -92,87 +79,87 @@ class ProtocolHandler:
         """
         tools/list: similar merging logic to initialize, but only returns { tools: [...] }.
         """
+        get = body.get
         combined_result = await self.multiplexer.list_tools(session_id, body)
         return {
-            "jsonrpc": body.get("jsonrpc", "2.0"),
-            "id": body.get("id"),
+            "jsonrpc": get("jsonrpc", "2.0"),
+            "id": get("id"),
             "result": combined_result,
         }
     
     async def _handle_tools_call(self, session_id: UUID, body: Dict[str, Any]) -> Dict[str, Any]:
         """
         Route tools/call to the correct backend based on prefixed tool name.
-        Uses tool_name_map to resolve provider and backend tool name.
+        Uses the session's fused tool routes to resolve handle, provider and backend tool name.
         """
-        params = body.get("params") or {}
+        # Hot path: bind frequently used attributes once
+        sm = self.session_manager
+        im = self.id_mapper
+        get = body.get
+
+        params = get("params") or {}
         tool_name = params.get("name")
         
         # ✅ LOG: Incoming request
-        logger.info("tools/call received: tool=%s, session=%s", tool_name, session_id)
+        logger.debug("tools/call received: tool=%s, session=%s", tool_name, session_id)
         
         if not tool_name:
             return self._jsonrpc_error(body, code=-32602, message="Missing tool 'name' in params")
 
-        # Look up the tool in the session's tool_name_map
-        tool_map = self.session_manager.get_tool_mapping(session_id)
-        tool_info = tool_map.get(tool_name)
-        
-        if not tool_info:
+        # Single lookup: tool name -> (handle, backend tool name, provider, streams_sse)
+        route = sm.get_tool_route(session_id, tool_name)
+        if route is None:
             return self._jsonrpc_error(
                 body,
                 code=-32602,
                 message=f"Unknown tool: {tool_name}. Tool may not exist or session may need reinitialization.",
             )
 
-        provider = tool_info["provider"]
-        backend_tool_name = tool_info["backend_tool_name"]
+        handle, backend_tool_name, provider, streams_sse = route
         
         # ✅ LOG: Tool mapping resolved
-        logger.info("Resolved tool: %s -> provider=%s, backend_tool=%s", tool_name, provider, backend_tool_name)
-
-        # Get the runtime state to access connections
-        runtime = await self.session_manager.get_runtime_state(session_id)
-        handle = runtime.connections.get(provider)
+        logger.debug("Resolved tool: %s -> provider=%s, backend_tool=%s", tool_name, provider, backend_tool_name)
         
-        if not handle:
+        if handle is None:
             return self._jsonrpc_error(
                 body,
                 code=-32001,
                 message=f"Provider '{provider}' not available in this session",
             )
 
-        # Prepare forwarded request body with the backend tool name
-        forward_body = dict(body)
-        forward_params = dict(params)
-        forward_params["name"] = backend_tool_name  # Use original backend tool name
-        forward_body["params"] = forward_params
-
         # Map client ID to backend ID for response correlation
-        client_id = body.get("id")
-        backend_id = self.id_mapper.register(session_id, provider, client_id)
-        forward_body["id"] = backend_id
+        client_id = get("id")
+        id_scope = im.scope(session_id, provider)
+        backend_id = id_scope.register(client_id)
+
+        # Serialize the forwarded request directly, swapping in the backend id and
+        # original backend tool name (body itself stays intact for error replies)
+        forward_payload = orjson.dumps(
+            {**body, "id": backend_id, "params": {**params, "name": backend_tool_name}}
+        )
         
         # ✅ LOG: Request being forwarded to backend
-        logger.info("Forwarding to %s: method=%s, name=%s, id=%s->%s", 
-                    provider, forward_body.get("method"), backend_tool_name, client_id, backend_id)
+        logger.debug("Forwarding to %s: method=%s, name=%s, id=%s->%s",
+                     provider, get("method"), backend_tool_name, client_id, backend_id)
 
         # Forward request to backend
         try:
-            resp = await handle.post(json=forward_body, timeout=settings.backend_timeout)
-            resp.raise_for_status()
-            #backend_payload = resp.json()
-            body_text=resp.text
+            # Stream the body: SSE replies are read only up to their first complete frame
+            async with handle.stream(forward_payload, timeout=settings.backend_timeout) as resp:
+                if resp.is_error:
+                    # Load the body so the HTTPStatusError handler can report it
+                    await resp.aread()
+                resp.raise_for_status()
+                is_sse = is_sse_response(resp, streams_sse)
+                raw = await read_first_sse_event(resp) if is_sse else await resp.aread()
             # ✅ LOG: Raw backend response
-            #logger.info("Backend %s responded: status=%s, payload_type=%s, payload=%s", 
-                        #provider, resp.status_code, type(backend_payload).__name__, backend_payload)
-            content_type = resp.headers.get("content-type", "")
-            logger.info(
+            logger.debug(
                 "Backend %s HTTP response: status=%s, content-type=%s",
-                provider, resp.status_code, content_type,
+                provider, resp.status_code, resp.headers.get("content-type"),
             )
-            if content_type.startswith("text/event-stream"):
+            if is_sse:
                 try:
-                    backend_payload = parse_sse_json_body(body_text)
+                    backend_payload = parse_sse_json_body(raw)
                 except Exception as e:
                     logger.warning("Failed to parse SSE body from provider=%s: %s", provider, e)
                     return self._jsonrpc_error(
@@ -182,8 +169,8 @@ class ProtocolHandler:
                     )
             else:
                 try:
-                    backend_payload = resp.json()
-                except ValueError as e:
+                    backend_payload = orjson.loads(raw)
+                except orjson.JSONDecodeError as e:
                     logger.warning("tools/call invalid JSON for provider=%s: %s", provider, e)
                     return self._jsonrpc_error(
                         body,
@@ -232,27 +219,34 @@ class ProtocolHandler:
 
         # Translate backend ID back to client ID
         backend_resp_id = backend_payload.get("id")
-        orig_client_id = self.id_mapper.resolve_backend(session_id, provider, backend_resp_id) or client_id
+        orig_client_id = id_scope.resolve(backend_resp_id, client_id)
         
         # ✅ LOG: ID translation
-        logger.info("Translating response ID: backend=%s -> client=%s", backend_resp_id, orig_client_id)
+        logger.debug("Translating response ID: backend=%s -> client=%s", backend_resp_id, orig_client_id)
         
         backend_payload["id"] = orig_client_id
         
         # Ensure jsonrpc field is present
-        if "jsonrpc" not in backend_payload:
-            backend_payload["jsonrpc"] = "2.0"
+        backend_payload.setdefault("jsonrpc", "2.0")
 
         # ✅ LOG: Final response being returned
-        logger.info("Returning tools/call response: id=%s, has_result=%s, has_error=%s, jsonrpc=%s", 
-                    backend_payload.get("id"), 
-                    "result" in backend_payload,
-                    "error" in backend_payload,
-                    backend_payload.get("jsonrpc"))
-        logger.debug("Full response payload: %s", backend_payload)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Returning tools/call response: id=%s, has_result=%s, has_error=%s, jsonrpc=%s",
+                         backend_payload.get("id"),
+                         "result" in backend_payload,
+                         "error" in backend_payload,
+                         backend_payload.get("jsonrpc"))
+            logger.debug("Full response payload: %s", backend_payload)
 
         return backend_payload
-    
+
+    # JSON-RPC method -> handler
+    _METHODS: ClassVar[Dict[str, Callable[..., Awaitable[Dict[str, Any]]]]] = {
+        _INITIALIZE: _handle_initialize,
+        _TOOLS_LIST: _handle_tools_list,
+        _TOOLS_CALL: _handle_tools_call,
+    }
+
     # async def _handle_tools_call(self, session_id: UUID, body: Dict[str, Any]) -> Dict[str, Any]:
     #     """
     #     Route tools/call to the correct backend based on the prefixed tool name.
@@ -549,12 +543,11 @@ class ProtocolHandler:
         message: str,
         data: Dict[str, Any] | None = None,
     ) -> Dict[str, Any]:
+        error: Dict[str, Any] = {"code": code, "message": message}
+        if data is not None:
+            error["data"] = data
         return {
             "jsonrpc": request_body.get("jsonrpc", "2.0"),
             "id": request_body.get("id"),
-            "error": {
-                "code": code,
-                "message": message,
-                **({"data": data} if data is not None else {}),
-            },
+            "error": error,
         }
\ No newline at end of file
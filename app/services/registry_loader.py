@@ -1,8 +1,17 @@
+import sys
+from functools import cached_property
 from pathlib import Path
-from typing import Dict
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Iterable, Mapping
 
 import yaml
-from pydantic import BaseModel, ValidationError,Field
+from pydantic import BaseModel, TypeAdapter, ValidationError,Field, field_validator
+
+try:
+    # libyaml-backed loader when available
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
 
 
 class ProviderConfig(BaseModel):
@@ -13,6 +22,22 @@ class ProviderConfig(BaseModel):
     api_key_header_name: str | None = None
     extra_headers: dict[str, str] = Field(default_factory=dict)
     persist_response_headers: list[str] = Field(default_factory=list)
+    # True/False pins the response framing; None inspects the Content-Type header
+    streams_sse: bool | None = None
+
+    @field_validator("name")
+    @classmethod
+    def _intern_name(cls, v: str) -> str:
+        # Provider names key most per-session maps; share one object per name
+        return sys.intern(v)
+
+    @cached_property
+    def persist_response_headers_lower(self) -> FrozenSet[str]:
+        return frozenset(h.lower() for h in self.persist_response_headers)
+
+
+_PROVIDERS_ADAPTER = TypeAdapter(Dict[str, ProviderConfig])
+
 
 class RegistryLoader:
     """
@@ -24,24 +49,43 @@ class RegistryLoader:
         if not self._path.exists():
             raise FileNotFoundError(f"registry.yaml not found at {registry_path}")
         self._providers: Dict[str, ProviderConfig] = {}
+        self._providers_view: Mapping[str, ProviderConfig] = MappingProxyType(self._providers)
+        self._provider_bits: Dict[str, int] = {}
         self._load()
 
     def _load(self) -> None:
-        data = yaml.safe_load(self._path.read_text())
+        data = yaml.load(self._path.read_bytes(), Loader=_Loader)
         servers = data.get("servers") or {}
-        providers: Dict[str, ProviderConfig] = {}
-        for name, cfg in servers.items():
-            try:
-                pc = ProviderConfig(**cfg)
-            except ValidationError as e:
-                raise ValueError(f"Invalid provider config for {name}: {e}") from e
-            providers[pc.name] = pc
-        self._providers = providers
+        # Validate every provider in one pydantic-core call; errors carry the YAML key in their loc
+        try:
+            validated = _PROVIDERS_ADAPTER.validate_python(servers)
+        except ValidationError as e:
+            raise ValueError(f"Invalid provider config: {e}") from e
+        # Providers are addressed by their configured name, which may differ from the YAML key
+        self._providers = {pc.name: pc for pc in validated.values()}
+        # Rebuilt with the dict so list_providers() never serves a replaced mapping
+        self._providers_view = MappingProxyType(self._providers)
+        # Stable bit per provider so a set of providers packs into one int
+        self._provider_bits = {name: 1 << i for i, name in enumerate(sorted(self._providers))}
 
     def get_provider_config(self, name: str) -> ProviderConfig:
-        if name not in self._providers:
-            raise KeyError(f"Provider '{name}' not found in registry")
-        return self._providers[name]
+        try:
+            return self._providers[name]
+        except KeyError:
+            raise KeyError(f"Provider '{name}' not found in registry") from None
+
+    def provider_mask(self, names: Iterable[str]) -> int:
+        """
+        Bitmask of the given provider names (see _provider_bits).
+        """
+        bits = self._provider_bits
+        mask = 0
+        for name in names:
+            mask |= bits[name]
+        return mask
 
-    def list_providers(self) -> Dict[str, ProviderConfig]:
-        return dict(self._providers)
\ No newline at end of file
+    def list_providers(self) -> Mapping[str, ProviderConfig]:
+        """
+        Read-only view of the registry; call dict(...) on it if a copy is needed.
+        """
+        return self._providers_view
\ No newline at end of file
@@ -1,14 +1,16 @@
-import json
+import asyncio
 import logging
+import operator
+import sys
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import Dict, List , Optional, FrozenSet , Any
+from typing import Dict, List , Optional, Any, NamedTuple, Tuple
 from uuid import UUID
 
+from sqlalchemy import update
 from sqlmodel import select
 
-from app.db.database import engine, get_db_session
-from app.db.models import MCPGatewaySession
+from app.db.database import get_db_session
+from app.db.models import MCPGatewaySession, utcnow
 from .auth_manager import AuthManager
 from .connection_manager import ConnectionManager, BackendHandle
 from .registry_loader import RegistryLoader, ProviderConfig
@@ -16,16 +18,50 @@ from .registry_loader import RegistryLoader, ProviderConfig
 
 logger = logging.getLogger(__name__)
 
+# Startup restore: rows fetched per DB round-trip / max runtimes hydrating at once
+_RESTORE_FETCH_SIZE = 500
+_RESTORE_CONCURRENCY = 32
 
-@dataclass
+# ProviderConfig fields persisted per server in servers_json
+_PROVIDER_FIELDS = ("name", "protocol", "rpc_endpoint", "auth_type", "api_key_header_name")
+_get_provider_fields = operator.attrgetter(*_PROVIDER_FIELDS)
+
+
+class ToolInfo(NamedTuple):
+    """
+    Routing record for a prefixed tool name.
+    """
+
+    provider: str
+    backend_tool_name: str
+
+
+class ToolRoute(NamedTuple):
+    """
+    Fully resolved tools/call target: the backend handle (None if the
+    provider has no connection in this session), backend tool name, provider
+    and the provider's registry `streams_sse` setting.
+    """
+
+    handle: Optional[BackendHandle]
+    backend_tool_name: str
+    provider: str
+    streams_sse: Optional[bool] = None
+
+
+@dataclass(slots=True)
 class RuntimeSessionState:
     connections: Dict[str, BackendHandle] = field(default_factory=dict)
-    # Mapping: "provider.tool" -> {"provider": provider_name, "backend_tool_name": original_name}
-    tool_name_map: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    # Mapping: "provider__tool" -> ToolInfo(provider=provider_name, backend_tool_name=original_name)
+    tool_name_map: Dict[str, ToolInfo] = field(default_factory=dict)
+    # Same keys as tool_name_map, fused with the provider's connection for tools/call
+    tool_routes: Dict[str, ToolRoute] = field(default_factory=dict)
     provider_session_headers: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    # Lazily computed registry bitmask of connection keys (connections are fixed once built)
+    providers_mask: Optional[int] = None
     cached_tools: Optional[Dict[str, Any]] = None
     cached_tools_ts: Optional[float] = None
-    cached_tools_providers: Optional[FrozenSet[str]] = None
+    cached_tools_providers: Optional[int] = None
 
 class SessionManager:
     """
@@ -44,6 +80,8 @@ class SessionManager:
         self.multiplexer = None
         # session_id -> RuntimeSessionState
         self._runtime_sessions: Dict[UUID, RuntimeSessionState] = {}
+        # session_id -> lock held while its runtime is rebuilt (single-flight)
+        self._build_locks: Dict[UUID, asyncio.Lock] = {}
         
     # ---------- Prewarm helpers ----------
     async def prewarm_session(self,session_id:UUID)-> None:
@@ -85,76 +123,81 @@ class SessionManager:
             
     # ---------- Persistence helpers ----------
 
-    def _persist_session(
+    async def _persist_session(
         self,
         servers: List[ProviderConfig],
         credentials: Dict,
         state: str = "ready",
     ) -> MCPGatewaySession:
-        servers_payload = [
-            {
-                "name": s.name,
-                "protocol": s.protocol,
-                "rpc_endpoint": s.rpc_endpoint,
-                "auth_type": s.auth_type,
-                "api_key_header_name": s.api_key_header_name,
-            }
-            for s in servers
-        ]
-        now = datetime.utcnow()
-
-        with get_db_session() as db:
+        servers_payload = [dict(zip(_PROVIDER_FIELDS, _get_provider_fields(s))) for s in servers]
+        now = utcnow()
+
+        async with get_db_session() as db:
             session_obj = MCPGatewaySession(
                 created_at=now,
                 updated_at=now,
                 state=state,
-                servers_json=json.dumps(servers_payload),
-                credentials_json=json.dumps(credentials),
+                servers_json=servers_payload,
+                credentials_json=credentials,
             )
             db.add(session_obj)
-            db.commit()
-            db.refresh(session_obj)
+            await db.commit()
+            await db.refresh(session_obj)
             return session_obj
 
-    def _load_session_model(self, session_id: UUID) -> MCPGatewaySession | None:
-        with get_db_session() as db:
+    async def _load_session_model(self, session_id: UUID) -> MCPGatewaySession | None:
+        async with get_db_session() as db:
             stmt = select(MCPGatewaySession).where(MCPGatewaySession.id == session_id)
-            return db.exec(stmt).first()
+            return (await db.exec(stmt)).first()
 
-    def _update_state(self, session_id: UUID, state: str) -> None:
-        with get_db_session() as db:
-            stmt = select(MCPGatewaySession).where(MCPGatewaySession.id == session_id)
-            sess = db.exec(stmt).first()
-            if not sess:
-                return
-            sess.state = state
-            sess.updated_at = datetime.utcnow()
-            db.add(sess)
-            db.commit()
+    async def _update_state(self, session_id: UUID, state: str) -> bool:
+        """
+        Set a session's state in a single UPDATE; returns False if no row matched.
+        """
+        stmt = (
+            update(MCPGatewaySession)
+            .where(MCPGatewaySession.id == session_id)
+            .values(state=state, updated_at=utcnow())
+        )
+        async with get_db_session() as db:
+            result = await db.exec(stmt)
+            await db.commit()
+            return result.rowcount > 0
 
     # ---------- Runtime helpers ----------
 
+    async def _make_one(
+        self, session_id: UUID, server: Dict[str, Any], credentials: Dict[str, Any]
+    ) -> Tuple[str, BackendHandle]:
+        """
+        Resolve config and auth headers for one persisted server entry and get its handle.
+        """
+        name = sys.intern(server["name"])
+        provider_cfg = self.registry_loader.get_provider_config(name)
+        creds_for_provider = credentials.get(name, {})
+        headers = self.auth_manager.build_headers(provider_cfg, creds_for_provider)
+
+        handle = await self.connection_manager.get_or_create_handle(
+            session_id,
+            name,
+            provider_cfg.rpc_endpoint,
+            headers,
+        )
+        return name, handle
+
     async def _build_runtime_state(self, db_session: MCPGatewaySession) -> RuntimeSessionState:
-        servers = json.loads(db_session.servers_json)
-        credentials = json.loads(db_session.credentials_json)
-        runtime = RuntimeSessionState(connections={}, tool_name_map={})
-
-        for s in servers:
-            name = s["name"]
-            provider_cfg = self.registry_loader.get_provider_config(name)
-            creds_for_provider = credentials.get(name, {})
-            headers = self.auth_manager.build_headers(provider_cfg, creds_for_provider)
-
-            handle = await self.connection_manager.get_or_create_handle(
-                db_session.id,
-                name,
-                provider_cfg.rpc_endpoint,
-                headers,
-            )
-            runtime.connections[name] = handle
+        credentials = db_session.credentials_json
+        # Providers are independent; set their handles up concurrently
+        results = await asyncio.gather(
+            *(self._make_one(db_session.id, s, credentials) for s in db_session.servers_json)
+        )
+        runtime = RuntimeSessionState(connections=dict(results), tool_name_map={})
 
         self._runtime_sessions[db_session.id] = runtime
-        print(f'Runtime is {runtime}')
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Runtime for session %s built with providers %s", db_session.id, list(runtime.connections)
+            )
         return runtime
 
     # ---------- Public API ----------
@@ -180,7 +223,7 @@ class SessionManager:
             provider_cfgs.append(cfg)
 
         # Persist
-        db_session = self._persist_session(provider_cfgs, credentials, state="ready")
+        db_session = await self._persist_session(provider_cfgs, credentials, state="ready")
 
         # Build runtime (best-effort; if it fails, mark state failed)
         try:
@@ -191,7 +234,7 @@ class SessionManager:
                 logger.exception("Prewarm failed for session %s (session remains ready)", db_session.id)
         except Exception:
             logger.exception("Failed to create runtime state for session %s", db_session.id)
-            self._update_state(db_session.id, "failed")
+            await self._update_state(db_session.id, "failed")
             raise
 
         return db_session
@@ -202,19 +245,35 @@ class SessionManager:
 
         Best-effort: failures are logged but do not abort startup.
         """
-        with get_db_session() as db:
-            stmt = select(MCPGatewaySession).where(MCPGatewaySession.state == "ready")
-            sessions = db.exec(stmt).all()
+        async with get_db_session() as db:
+            stmt = (
+                select(MCPGatewaySession)
+                .where(MCPGatewaySession.state == "ready")
+                .execution_options(yield_per=_RESTORE_FETCH_SIZE)
+            )
+            result = await db.stream_scalars(stmt)
+            restore_slots = asyncio.Semaphore(_RESTORE_CONCURRENCY)
 
-        for sess in sessions:
-            try:
-                await self._build_runtime_state(sess)
-                logger.info("Restored runtime state for session %s", sess.id)
-            except Exception:
-                logger.exception("Failed to restore runtime state for session %s", sess.id)
+            async def _restore(sess: MCPGatewaySession) -> RuntimeSessionState:
+                async with restore_slots:
+                    return await self._build_runtime_state(sess)
+
+            async for partition in result.partitions():
+                results = await asyncio.gather(
+                    *(_restore(sess) for sess in partition),
+                    return_exceptions=True,
+                )
+                for sess, res in zip(partition, results):
+                    # BaseException: a cancelled restore must not be logged as restored
+                    if isinstance(res, BaseException):
+                        logger.error(
+                            "Failed to restore runtime state for session %s", sess.id, exc_info=res
+                        )
+                    else:
+                        logger.info("Restored runtime state for session %s", sess.id)
 
-    def ensure_session_exists(self, session_id: UUID) -> MCPGatewaySession:
-        sess = self._load_session_model(session_id)
+    async def ensure_session_exists(self, session_id: UUID) -> MCPGatewaySession:
+        sess = await self._load_session_model(session_id)
         if not sess:
             raise KeyError(f"Session {session_id} not found")
         return sess
@@ -223,26 +282,56 @@ class SessionManager:
         """
         Ensure runtime state exists; if not, re-create from persisted data.
         """
-        if session_id in self._runtime_sessions:
-            return self._runtime_sessions[session_id]
+        runtime = self._runtime_sessions.get(session_id)
+        if runtime is not None:
+            return runtime
 
-        sess = self._load_session_model(session_id)
-        if not sess:
-            raise KeyError(f"Session {session_id} not found")
-        return await self._build_runtime_state(sess)
+        lock = self._build_locks.setdefault(session_id, asyncio.Lock())
+        try:
+            async with lock:
+                # Another caller may have finished the rebuild while we waited
+                runtime = self._runtime_sessions.get(session_id)
+                if runtime is not None:
+                    return runtime
+
+                sess = await self._load_session_model(session_id)
+                if not sess:
+                    raise KeyError(f"Session {session_id} not found")
+                return await self._build_runtime_state(sess)
+        finally:
+            if self._build_locks.get(session_id) is lock:
+                del self._build_locks[session_id]
 
-    def get_session_info(self, session_id: UUID) -> MCPGatewaySession | None:
-        return self._load_session_model(session_id)
+    async def get_session_info(self, session_id: UUID) -> MCPGatewaySession | None:
+        return await self._load_session_model(session_id)
 
-    def update_tool_map(self, session_id: UUID, tool_map: Dict[str, Dict[str, str]]) -> None:
+    def update_tool_map(self, session_id: UUID, tool_map: Dict[str, ToolInfo]) -> None:
         runtime = self._runtime_sessions.get(session_id)
         if not runtime:
             # Do not fail hard; just log
             logger.warning("update_tool_map called for unknown runtime session %s", session_id)
             return
         runtime.tool_name_map = tool_map
+        connections = runtime.connections
+        get_config = self.registry_loader.get_provider_config
+        streams_sse = {provider: get_config(provider).streams_sse for provider in connections}
+        runtime.tool_routes = {
+            name: ToolRoute(
+                connections.get(info.provider),
+                info.backend_tool_name,
+                info.provider,
+                streams_sse.get(info.provider),
+            )
+            for name, info in tool_map.items()
+        }
+
+    def get_tool_route(self, session_id: UUID, tool_name: str) -> ToolRoute | None:
+        """
+        Resolve a prefixed tool name straight to its handle and backend tool name.
+        """
+        runtime = self._runtime_sessions.get(session_id)
+        return runtime.tool_routes.get(tool_name) if runtime else None
 
-    def get_tool_mapping(self, session_id: UUID) -> Dict[str, Dict[str, str]]:
+    def get_tool_mapping(self, session_id: UUID) -> Dict[str, ToolInfo]:
         runtime = self._runtime_sessions.get(session_id)
-        print(f'runtime is {runtime}')
         return runtime.tool_name_map if runtime else {}
\ No newline at end of file
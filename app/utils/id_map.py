@@ -1,6 +1,62 @@
-from collections import defaultdict
-from typing import Any, Dict, Optional
-from uuid import uuid4, UUID
+import itertools
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Iterator, Optional, Tuple
+from uuid import UUID
+
+# (session_id, provider, backend_id)
+IdKey = Tuple[UUID, str, int]
+
+
+class IdScope:
+    """
+    Id mappings for a single (session, provider) pair.
+
+    Binds the session and provider once so a request can register and later
+    resolve its id with a single lookup in the shared flat map.
+    """
+
+    __slots__ = (
+        "_backend_to_client", "_session_keys", "_max_entries", "_session_id", "_provider", "_counter"
+    )
+
+    def __init__(
+        self,
+        backend_to_client: Dict[IdKey, Any],
+        session_keys: "OrderedDict[IdKey, None]",
+        max_entries: int,
+        session_id: UUID,
+        provider: str,
+        counter: Iterator[int],
+    ) -> None:
+        self._backend_to_client = backend_to_client
+        self._session_keys = session_keys
+        self._max_entries = max_entries
+        self._session_id = session_id
+        self._provider = provider
+        self._counter = counter
+
+    def register(self, client_id: Any) -> int:
+        """
+        Register a new outgoing request. Returns backend_id.
+        """
+        backend_id = next(self._counter)
+        key = (self._session_id, self._provider, backend_id)
+        self._backend_to_client[key] = client_id
+        session_keys = self._session_keys
+        session_keys[key] = None
+        if len(session_keys) > self._max_entries:
+            # Oldest mapping for this session; its response has almost certainly arrived
+            oldest, _ = session_keys.popitem(last=False)
+            self._backend_to_client.pop(oldest, None)
+        return backend_id
+
+    def resolve(self, backend_id: Any, default: Any = None) -> Optional[Any]:
+        """
+        Resolve backend_id back to the original client_id (type preserved).
+        Returns default only when no mapping exists, so a stored None/0 client_id
+        is never mistaken for a miss.
+        """
+        return self._backend_to_client.get((self._session_id, self._provider, backend_id), default)
 
 
 class IdMapper:
@@ -13,39 +69,50 @@ class IdMapper:
     the design clean.
     """
 
-    def __init__(self) -> None:
-        # key: "session:provider" -> {backend_id_str: original_client_id}
-        # We store backend_id as string (UUID), but client_id as-is (preserve type)
-        self._backend_to_client: Dict[str, Dict[str, Any]] = defaultdict(dict)
+    __slots__ = ("_max_entries_per_session", "_backend_to_client", "_keys_by_session", "_next")
 
-    @staticmethod
-    def _key(session_id: UUID, provider: str) -> str:
-        return f"{session_id}:{provider}"
+    def __init__(self, max_entries_per_session: int = 10_000) -> None:
+        # Cap on live mappings per session; the oldest are evicted first
+        self._max_entries_per_session = max_entries_per_session
+        # (session_id, provider, backend_id) -> original_client_id
+        # backend_id is a per-session int, but client_id is kept as-is (preserve type)
+        self._backend_to_client: Dict[IdKey, Any] = {}
+        # session_id -> keys registered for it, oldest first, so teardown and
+        # eviction never scan other sessions
+        self._keys_by_session: Dict[UUID, "OrderedDict[IdKey, None]"] = defaultdict(OrderedDict)
+        # session_id -> monotonically increasing backend id source
+        self._next: Dict[UUID, Iterator[int]] = defaultdict(lambda: itertools.count(1))
 
-    def register(self, session_id: UUID, provider: str, client_id: Any) -> str:
+    def scope(self, session_id: UUID, provider: str) -> IdScope:
+        """
+        Return an IdScope bound to this (session, provider) pair.
+        """
+        return IdScope(
+            self._backend_to_client,
+            self._keys_by_session[session_id],
+            self._max_entries_per_session,
+            session_id,
+            provider,
+            self._next[session_id],
+        )
+
+    def register(self, session_id: UUID, provider: str, client_id: Any) -> int:
         """
         Register a new outgoing request for mapping. Returns backend_id.
         Stores the original client_id with its type preserved.
         """
-        backend_id = str(uuid4())
-        key = self._key(session_id, provider)
-        
-        # ✅ Store original client_id (int, str, or None)
-        self._backend_to_client[key][backend_id] = client_id
-        
-        return backend_id
+        return self.scope(session_id, provider).register(client_id)
 
-    def resolve_backend(self, session_id: UUID, provider: str, backend_id: Any) -> Optional[Any]:
+    def resolve_backend(
+        self, session_id: UUID, provider: str, backend_id: Any, default: Any = None
+    ) -> Optional[Any]:
         """
         Resolve backend_id back to the original client_id.
-        Returns the client_id with its original type preserved.
+        Returns the client_id with its original type preserved, or default if unmapped.
         """
-        key = self._key(session_id, provider)
-        # ✅ Return original client_id (preserves type)
-        return self._backend_to_client.get(key, {}).get(str(backend_id))
+        return self._backend_to_client.get((session_id, provider, backend_id), default)
 
     def clear_session(self, session_id: UUID) -> None:
-        prefix = f"{session_id}:"
-        to_delete = [k for k in self._backend_to_client if k.startswith(prefix)]
-        for k in to_delete:
-            self._backend_to_client.pop(k, None)
\ No newline at end of file
+        for k in self._keys_by_session.pop(session_id, ()):
+            self._backend_to_client.pop(k, None)
+        self._next.pop(session_id, None)
@@ -1,34 +1,14 @@
-import asyncio
-from typing import Awaitable, Callable, Iterable, Type, TypeVar
+from functools import lru_cache
+from typing import Tuple
 
-T = TypeVar("T")
 
-
-async def async_retry(
-    func: Callable[[], Awaitable[T]],
-    *,
-    retries: int,
-    base_delay: float,
-    exceptions: Iterable[Type[BaseException]],
-) -> T:
+@lru_cache(maxsize=64)
+def backoff_schedule(retries: int, base_delay: float, max_delay: float) -> Tuple[float, ...]:
     """
-    Simple async retry helper with exponential backoff.
+    Capped exponential backoff delays for each retry, built once per configuration.
 
-    param func: async callable returning a value
     param retries: number of retries (not counting the first attempt)
     param base_delay: initial backoff delay in seconds
-    param exceptions: iterable of exception types considered transient
+    param max_delay: upper bound for any single backoff delay
     """
-    attempt = 0
-    delay = base_delay
-    exc_types = tuple(exceptions)
-
-    while True:
-        try:
-            return await func()
-        except exc_types:
-            if attempt >= retries:
-                raise
-            await asyncio.sleep(delay)
-            delay *= 2
-            attempt += 1
\ No newline at end of file
+    return tuple(min(max_delay, base_delay * (1 << i)) for i in range(retries))
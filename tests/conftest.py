@@ -0,0 +1,20 @@
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.db import database
+
+
+@pytest.fixture
+def db_engine(tmp_path, monkeypatch):
+    """
+    Point the app's engine and session factory at a throwaway SQLite file.
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'gateway.db'}")
+    monkeypatch.setattr(database, "engine", engine)
+    monkeypatch.setattr(
+        database,
+        "async_session_factory",
+        async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False),
+    )
+    return engine
@@ -0,0 +1,95 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.services import connection_manager
+from app.services.connection_manager import BackendHandle
+
+
+def _flaky_client(failures: int):
+    """
+    Client whose transport raises ConnectError for the first `failures` attempts.
+    """
+    attempts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        attempts.append(request)
+        if len(attempts) <= failures:
+            raise httpx.ConnectError(f"attempt {len(attempts)} refused", request=request)
+        return httpx.Response(200, json={"ok": True})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler)), attempts
+
+
+@pytest.fixture
+def retry_settings(monkeypatch):
+    """
+    Apply retry settings overrides and record the backoff sleeps instead of waiting.
+    """
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+
+    monkeypatch.setattr(connection_manager.asyncio, "sleep", fake_sleep)
+
+    def apply(**overrides):
+        monkeypatch.setattr(
+            connection_manager, "settings", connection_manager.settings.model_copy(update=overrides)
+        )
+
+    return apply, sleeps
+
+
+def _post(client) -> httpx.Response:
+    return asyncio.run(BackendHandle(client, base_url="http://backend/mcp", headers={}).post(b"{}"))
+
+
+def test_retries_until_success_with_capped_schedule(retry_settings):
+    apply, sleeps = retry_settings
+    apply(retry_attempts=4, retry_backoff_base=0.5, retry_max_delay=1.5, retry_jitter=False)
+    client, attempts = _flaky_client(failures=4)
+
+    assert _post(client).json() == {"ok": True}
+    assert len(attempts) == 5
+    assert sleeps == [0.5, 1.0, 1.5, 1.5]
+
+
+def test_final_attempt_error_propagates(retry_settings):
+    apply, sleeps = retry_settings
+    apply(retry_attempts=2, retry_backoff_base=0.5, retry_max_delay=30.0, retry_jitter=False)
+    client, attempts = _flaky_client(failures=10)
+
+    with pytest.raises(httpx.ConnectError, match="attempt 3 refused"):
+        _post(client)
+    assert len(attempts) == 3
+    assert sleeps == [0.5, 1.0]
+
+
+def test_no_retries_configured(retry_settings):
+    apply, sleeps = retry_settings
+    apply(retry_attempts=0, retry_jitter=False)
+    client, attempts = _flaky_client(failures=1)
+
+    with pytest.raises(httpx.ConnectError):
+        _post(client)
+    assert len(attempts) == 1
+    assert sleeps == []
+
+
+def test_jittered_delays_stay_within_schedule_bounds(retry_settings):
+    apply, sleeps = retry_settings
+    base, cap = 0.25, 1.5
+    apply(retry_attempts=6, retry_backoff_base=base, retry_max_delay=cap, retry_jitter=True)
+
+    for _ in range(20):
+        client, attempts = _flaky_client(failures=6)
+        assert _post(client).json() == {"ok": True}
+        assert len(attempts) == 7
+
+    assert len(sleeps) == 20 * 6
+    for i, delay in enumerate(sleeps):
+        assert base <= delay <= min(cap, base * 2 ** (i % 6))
+    # Jittered, not the deterministic schedule
+    assert len(set(sleeps)) > 6
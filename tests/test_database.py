@@ -0,0 +1,76 @@
+import asyncio
+import json
+from uuid import uuid4
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.db.database import init_db
+from app.services.auth_manager import AuthManager
+from app.services.connection_manager import ConnectionManager
+from app.services.registry_loader import RegistryLoader
+from app.services.session_manager import SessionManager
+
+# sessions table as created before ids were stored as binary GUIDs
+_LEGACY_SCHEMA = (
+    "CREATE TABLE sessions ("
+    " id CHAR(32) NOT NULL, created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL,"
+    " state VARCHAR NOT NULL, servers_json VARCHAR NOT NULL, credentials_json VARCHAR NOT NULL,"
+    " PRIMARY KEY (id))",
+    "CREATE INDEX ix_sessions_id ON sessions (id)",
+    "CREATE INDEX ix_sessions_state ON sessions (state)",
+)
+
+
+async def _create_legacy_rows(engine, rows) -> None:
+    async with engine.begin() as conn:
+        for ddl in _LEGACY_SCHEMA:
+            await conn.execute(text(ddl))
+        for session_id, servers, credentials in rows:
+            await conn.execute(
+                text(
+                    "INSERT INTO sessions VALUES (:id, '2026-01-01 00:00:00.000000',"
+                    " '2026-01-01 00:00:00.000000', 'ready', :servers, :credentials)"
+                ),
+                {"id": session_id.hex, "servers": json.dumps(servers), "credentials": json.dumps(credentials)},
+            )
+
+
+def _session_manager() -> SessionManager:
+    return SessionManager(RegistryLoader(settings.registry_path), AuthManager(), ConnectionManager())
+
+
+def test_init_db_upgrades_legacy_sessions_table(db_engine):
+    with_provider, bare = uuid4(), uuid4()
+    servers = [{"name": "huggingface", "protocol": "http"}]
+
+    async def scenario():
+        await _create_legacy_rows(
+            db_engine,
+            [(with_provider, servers, {"huggingface": {"token": "t"}}), (bare, [], {})],
+        )
+        await init_db()
+        # Idempotent: a second startup finds nothing left to rewrite
+        await init_db()
+
+        async with db_engine.connect() as conn:
+            kinds = (await conn.execute(text("SELECT DISTINCT typeof(id) FROM sessions"))).scalars().all()
+            indexes = (
+                await conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'"))
+            ).scalars().all()
+        assert kinds == ["blob"]
+        assert "ix_sessions_updated_at" in indexes
+
+        sm = _session_manager()
+        loaded = await sm.ensure_session_exists(with_provider)
+        assert loaded.id == with_provider
+        assert loaded.servers_json == servers
+
+        await sm.load_persisted_sessions()
+        assert set(sm._runtime_sessions) == {with_provider, bare}
+        assert list(sm._runtime_sessions[with_provider].connections) == ["huggingface"]
+
+        assert await sm._update_state(bare, "failed")
+        assert (await sm.get_session_info(bare)).state == "failed"
+
+    asyncio.run(scenario())
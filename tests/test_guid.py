@@ -0,0 +1,45 @@
+from uuid import uuid4
+
+from sqlalchemy import Column, MetaData, Table, create_engine, insert, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.db.models import GUID
+
+
+def _table():
+    metadata = MetaData()
+    table = Table("t", metadata, Column("id", GUID(), primary_key=True))
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    return engine, table
+
+
+def test_guid_round_trip_sqlite():
+    engine, table = _table()
+    value = uuid4()
+    with engine.begin() as conn:
+        conn.execute(insert(table).values(id=value))
+        assert conn.execute(select(table.c.id)).scalar_one() == value
+        assert conn.execute(select(table.c.id).where(table.c.id == value)).scalar_one() == value
+        # Stored as 16 raw bytes, not text
+        assert conn.execute(text("SELECT typeof(id), length(id) FROM t")).one() == ("blob", 16)
+
+
+def test_guid_reads_legacy_hex_text():
+    engine, table = _table()
+    value = uuid4()
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO t (id) VALUES (:id)"), {"id": value.hex})
+        assert conn.execute(select(table.c.id)).scalar_one() == value
+    guid = GUID()
+    assert guid.process_result_value(str(value), sqlite.dialect()) == value
+
+
+def test_guid_binds_per_dialect():
+    guid = GUID()
+    value = uuid4()
+    assert guid.process_bind_param(value, sqlite.dialect()) == value.bytes
+    assert guid.process_bind_param(str(value), sqlite.dialect()) == value.bytes
+    assert guid.process_bind_param(value, postgresql.dialect()) == value
+    assert guid.process_bind_param(None, sqlite.dialect()) is None
+    assert guid.process_result_value(value.bytes, sqlite.dialect()) == value
@@ -0,0 +1,61 @@
+from uuid import uuid4
+
+from app.utils.id_map import IdMapper
+
+
+def test_register_and_resolve_per_scope():
+    mapper = IdMapper()
+    session_id = uuid4()
+    github = mapper.scope(session_id, "github")
+    notion = mapper.scope(session_id, "notion")
+
+    a = github.register("req-a")
+    b = notion.register("req-b")
+    assert a != b
+    assert github.resolve(a) == "req-a"
+    # Backend ids are scoped to their provider
+    assert github.resolve(b) is None
+    assert mapper.resolve_backend(session_id, "notion", b) == "req-b"
+    assert mapper.register(session_id, "github", 42) == b + 1
+    assert github.resolve(b + 1) == 42
+
+
+def test_clear_session_only_drops_that_session():
+    mapper = IdMapper()
+    session_id, other_id = uuid4(), uuid4()
+    backend_id = mapper.register(session_id, "github", "mine")
+    other_backend_id = mapper.register(other_id, "github", "theirs")
+
+    mapper.clear_session(session_id)
+
+    assert mapper.resolve_backend(session_id, "github", backend_id) is None
+    assert mapper.resolve_backend(other_id, "github", other_backend_id) == "theirs"
+    # Counters restart for a cleared session
+    assert mapper.register(session_id, "github", "again") == 1
+
+
+def test_resolve_default_only_on_miss():
+    mapper = IdMapper()
+    session_id = uuid4()
+    scope = mapper.scope(session_id, "github")
+
+    falsy = [scope.register(v) for v in (0, "", None)]
+    # Falsy client ids are returned as-is, not treated as misses
+    assert [scope.resolve(b, "fallback") for b in falsy] == [0, "", None]
+    assert scope.resolve(999, "fallback") == "fallback"
+    assert mapper.resolve_backend(session_id, "github", falsy[0], "fallback") == 0
+    assert mapper.resolve_backend(session_id, "notion", falsy[0], "fallback") == "fallback"
+
+
+def test_oldest_entries_are_evicted_per_session():
+    mapper = IdMapper(max_entries_per_session=3)
+    session_id, other_id = uuid4(), uuid4()
+    scope = mapper.scope(session_id, "github")
+    other = mapper.scope(other_id, "github")
+
+    other_backend_id = other.register("other")
+    ids = [scope.register(n) for n in range(5)]
+
+    assert [scope.resolve(i, "missing") for i in ids] == ["missing", "missing", 2, 3, 4]
+    # Eviction never touches another session's mappings
+    assert other.resolve(other_backend_id) == "other"
@@ -0,0 +1,24 @@
+from app.services.registry_loader import RegistryLoader
+
+_REGISTRY = """
+servers:
+  {key}:
+    name: "{name}"
+    protocol: "http"
+    rpc_endpoint: "https://{name}.example/mcp"
+    auth_type: "bearer"
+"""
+
+
+def test_list_providers_tracks_reload(tmp_path):
+    path = tmp_path / "registry.yaml"
+    path.write_text(_REGISTRY.format(key="gh", name="github"))
+    loader = RegistryLoader(str(path))
+    assert list(loader.list_providers()) == ["github"]
+
+    path.write_text(_REGISTRY.format(key="nt", name="notion"))
+    loader._load()
+
+    assert list(loader.list_providers()) == ["notion"]
+    assert loader.get_provider_config("notion").rpc_endpoint == "https://notion.example/mcp"
+    assert loader.provider_mask(["notion"]) == 1
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.config import settings
+from app.db.database import init_db
+from app.services.auth_manager import AuthManager
+from app.services.connection_manager import ConnectionManager
+from app.services.registry_loader import RegistryLoader
+from app.services.session_manager import RuntimeSessionState, SessionManager, ToolInfo, ToolRoute
+
+
+@pytest.fixture
+def session_manager():
+    return SessionManager(RegistryLoader(settings.registry_path), AuthManager(), ConnectionManager())
+
+
+def _stub_persistence(monkeypatch, sm: SessionManager, rows):
+    """
+    Serve session rows from `rows` and count runtime builds; each load and build
+    yields to the loop so concurrent callers genuinely overlap.
+    """
+    builds = []
+    build_runtime_state = sm._build_runtime_state
+
+    async def load_session_model(session_id):
+        await asyncio.sleep(0)
+        return rows.get(session_id)
+
+    async def counting_build(db_session):
+        builds.append(db_session.id)
+        await asyncio.sleep(0.01)
+        return await build_runtime_state(db_session)
+
+    monkeypatch.setattr(sm, "_load_session_model", load_session_model)
+    monkeypatch.setattr(sm, "_build_runtime_state", counting_build)
+    return builds
+
+
+def test_concurrent_get_runtime_state_builds_once(monkeypatch, session_manager):
+    session_id = uuid4()
+    row = SimpleNamespace(id=session_id, servers_json=[], credentials_json={})
+    builds = _stub_persistence(monkeypatch, session_manager, {session_id: row})
+
+    async def scenario():
+        return await asyncio.gather(*(session_manager.get_runtime_state(session_id) for _ in range(10)))
+
+    runtimes = asyncio.run(scenario())
+
+    assert builds == [session_id]
+    assert all(r is runtimes[0] for r in runtimes)
+    assert session_manager._build_locks == {}
+
+
+def test_get_runtime_state_unknown_session_releases_lock(monkeypatch, session_manager):
+    session_id = uuid4()
+    builds = _stub_persistence(monkeypatch, session_manager, {})
+
+    async def scenario():
+        return await asyncio.gather(
+            *(session_manager.get_runtime_state(session_id) for _ in range(5)), return_exceptions=True
+        )
+
+    results = asyncio.run(scenario())
+
+    assert all(isinstance(r, KeyError) for r in results)
+    assert builds == []
+    assert session_manager._build_locks == {}
+    assert session_id not in session_manager._runtime_sessions
+
+
+def test_tool_routes_carry_provider_framing(session_manager):
+    session_id = uuid4()
+    handle = object()
+    session_manager._runtime_sessions[session_id] = RuntimeSessionState(connections={"huggingface": handle})
+
+    session_manager.update_tool_map(
+        session_id,
+        {
+            "huggingface__search": ToolInfo("huggingface", "search"),
+            "github__issues": ToolInfo("github", "issues"),
+        },
+    )
+
+    expected_sse = session_manager.registry_loader.get_provider_config("huggingface").streams_sse
+    assert session_manager.get_tool_route(session_id, "huggingface__search") == ToolRoute(
+        handle, "search", "huggingface", expected_sse
+    )
+    # Provider without a connection in this session: no handle, no framing hint
+    assert session_manager.get_tool_route(session_id, "github__issues") == ToolRoute(None, "issues", "github", None)
+    assert session_manager.get_tool_route(session_id, "missing") is None
+
+
+def test_load_persisted_sessions_reports_cancelled_restores(db_engine, monkeypatch, caplog, session_manager):
+    async def scenario():
+        await init_db()
+        ok = await session_manager._persist_session([], {})
+        cancelled = await session_manager._persist_session([], {})
+        build_runtime_state = session_manager._build_runtime_state
+
+        async def build(db_session):
+            if db_session.id == cancelled.id:
+                raise asyncio.CancelledError()
+            return await build_runtime_state(db_session)
+
+        monkeypatch.setattr(session_manager, "_build_runtime_state", build)
+        await session_manager.load_persisted_sessions()
+        return ok.id, cancelled.id
+
+    with caplog.at_level(logging.INFO, logger="app.services.session_manager"):
+        ok_id, cancelled_id = asyncio.run(scenario())
+
+    messages = [r.getMessage() for r in caplog.records]
+    assert f"Restored runtime state for session {ok_id}" in messages
+    assert f"Failed to restore runtime state for session {cancelled_id}" in messages
+    assert f"Restored runtime state for session {cancelled_id}" not in messages
+    assert set(session_manager._runtime_sessions) == {ok_id}
@@ -0,0 +1,170 @@
+import asyncio
+import itertools
+import re
+
+import httpx
+import pytest
+
+from app.services.connection_manager import BackendHandle
+from app.services.multiplexer import parse_jsonrpc_body, parse_sse_json_body, read_first_sse_event
+
+
+class _ChunkedStream(httpx.AsyncByteStream):
+    def __init__(self, chunks):
+        self._chunks = chunks
+
+    async def __aiter__(self):
+        for chunk in self._chunks:
+            yield chunk
+
+
+def _read_first(chunks) -> bytes:
+    resp = httpx.Response(200, stream=_ChunkedStream(chunks))
+    return asyncio.run(read_first_sse_event(resp))
+
+
+def _splits(body: bytes, parts: int):
+    """
+    Every way of cutting body into `parts` contiguous (possibly empty) chunks.
+    """
+    for cuts in itertools.combinations_with_replacement(range(len(body) + 1), parts - 1):
+        bounds = (0, *cuts, len(body))
+        yield [body[a:b] for a, b in zip(bounds, bounds[1:])]
+
+
+MESSAGE = b'event: message\ndata: {"jsonrpc":"2.0","id":1,"result":{}}\n\n'
+CRLF_MESSAGE = b'event: message\r\ndata: {"jsonrpc":"2.0","id":1,"result":{}}\r\n\r\n'
+EXPECTED = {"jsonrpc": "2.0", "id": 1, "result": {}}
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        MESSAGE,
+        CRLF_MESSAGE,
+        b'data: {"jsonrpc":"2.0","id":1,"result":{}}\n\n',
+        b': keep-alive\nid: 7\nevent: message\ndata: {"jsonrpc":"2.0","id":1,"result":{}}\n\n',
+        # No trailing newline after the data line
+        b'event: message\ndata: {"jsonrpc":"2.0","id":1,"result":{}}',
+    ],
+)
+def test_parse_sse_json_body_frames(body):
+    assert parse_sse_json_body(body) == EXPECTED
+
+
+def test_parse_sse_json_body_returns_first_of_several_events():
+    body = MESSAGE + b'event: message\ndata: {"jsonrpc":"2.0","id":2,"result":{}}\n\n'
+    assert parse_sse_json_body(body) == EXPECTED
+
+
+def test_parse_sse_json_body_without_data_line():
+    with pytest.raises(ValueError):
+        parse_sse_json_body(b"event: message\n\n")
+
+
+def test_parse_jsonrpc_body_rejects_non_object():
+    with pytest.raises(ValueError):
+        parse_jsonrpc_body(b"data: [1, 2]\n\n", is_sse=True)
+    assert parse_jsonrpc_body(b'{"id": 1}', is_sse=False) == {"id": 1}
+
+
+@pytest.mark.parametrize("body", [MESSAGE, CRLF_MESSAGE])
+def test_read_first_sse_event_every_three_way_split(body):
+    for chunks in _splits(body, 3):
+        head = _read_first(chunks)
+        assert parse_sse_json_body(head) == EXPECTED, chunks
+        # Stops right after the data line, before the blank separator
+        assert head.endswith(b"}\n") or head.endswith(b"}\r\n"), chunks
+
+
+def test_read_first_sse_event_split_data_prefix():
+    head = _read_first([b"event: message\n", b"da", b"ta: {", b'"id":1}', b"\n\nevent: message\n"])
+    assert head == b'event: message\ndata: {"id":1}\n'
+
+
+def test_read_first_sse_event_drains_a_finished_stream():
+    second = b'event: message\ndata: {"jsonrpc":"2.0","id":2,"result":{}}\n\n'
+    consumed = []
+
+    class _Recording(httpx.AsyncByteStream):
+        async def __aiter__(self):
+            for chunk in (MESSAGE, second):
+                consumed.append(chunk)
+                yield chunk
+
+    resp = httpx.Response(200, stream=_Recording())
+    head = asyncio.run(read_first_sse_event(resp))
+    assert parse_sse_json_body(head) == EXPECTED
+    # The tail is read (so the connection can be pooled) but not returned
+    assert consumed == [MESSAGE, second]
+    assert resp.is_stream_consumed
+
+
+def test_read_first_sse_event_cuts_off_open_ended_stream():
+    class _OpenEnded(httpx.AsyncByteStream):
+        async def __aiter__(self):
+            yield MESSAGE
+            await asyncio.Event().wait()  # backend keeps the stream open
+            yield b"unreachable"
+
+    async def scenario():
+        resp = httpx.Response(200, stream=_OpenEnded())
+        head = await asyncio.wait_for(read_first_sse_event(resp), 1.0)
+        await resp.aclose()
+        return head
+
+    assert parse_sse_json_body(asyncio.run(scenario())) == EXPECTED
+
+
+def test_read_first_sse_event_without_data_returns_everything():
+    assert _read_first([b"event: ping\n", b"\n"]) == b"event: ping\n\n"
+
+
+async def _sse_backend(framing: str):
+    """
+    Minimal keep-alive HTTP/1.1 backend answering every POST with MESSAGE as SSE.
+    Returns (server, url, connections) where connections counts accepted sockets.
+    """
+    connections = []
+
+    async def handle(reader, writer):
+        connections.append(writer)
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = re.search(rb"(?i)content-length: *(\d+)", head)
+                await reader.readexactly(int(length.group(1)) if length else 0)
+                status = b"HTTP/1.1 200 OK\r\ncontent-type: text/event-stream\r\n"
+                if framing == "content-length":
+                    writer.write(status + b"content-length: %d\r\n\r\n" % len(MESSAGE) + MESSAGE)
+                else:
+                    # Chunked: the frame first, then the closing blank line and end of stream
+                    frame, tail = MESSAGE[:-1], MESSAGE[-1:]
+                    writer.write(status + b"transfer-encoding: chunked\r\n\r\n")
+                    writer.write(b"%x\r\n%s\r\n" % (len(frame), frame))
+                    await writer.drain()
+                    await asyncio.sleep(0.01)
+                    writer.write(b"%x\r\n%s\r\n0\r\n\r\n" % (len(tail), tail))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, f"http://127.0.0.1:{port}/mcp", connections
+
+
+@pytest.mark.parametrize("framing", ["content-length", "chunked"])
+def test_streamed_sse_calls_reuse_the_connection(framing):
+    async def scenario():
+        server, url, connections = await _sse_backend(framing)
+        async with server, httpx.AsyncClient() as client:
+            handle = BackendHandle(client, base_url=url, headers={})
+            for _ in range(3):
+                async with handle.stream(b"{}") as resp:
+                    assert parse_sse_json_body(await read_first_sse_event(resp)) == EXPECTED
+            return len(connections)
+
+    assert asyncio.run(scenario()) == 1